@@ -0,0 +1,320 @@
+"""
+Google Cloud Storage Async Utility Functions
+
+This module provides asyncio versions of the upload and delete helpers in
+GCS_utils, talking to the Cloud Storage JSON API (XML API for uploads)
+directly with httpx over HTTP/2 so that many transfers share a single event
+loop and are multiplexed over a few connections.
+"""
+
+import asyncio
+import mimetypes
+import os
+import pathlib
+from functools import wraps
+from typing import AsyncIterator, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+API_URL = "https://storage.googleapis.com/storage/v1"
+XML_API_URL = "https://storage.googleapis.com"
+
+DEFAULT_TIMEOUT = httpx.Timeout(600)
+DEFAULT_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Object metadata applied at upload time
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+# Size of the pieces a file is streamed in during upload; each piece is read
+# in a worker thread, so large pieces keep the thread hand-offs rare
+UPLOAD_READ_SIZE = 4 * 1024 * 1024
+
+# Partial response for listings that only need object names
+LIST_NAMES_FIELDS = "items(name),nextPageToken"
+LIST_PAGE_SIZE = 1000
+
+# Number of attempts for requests that hit transient errors
+RETRY_ATTEMPTS = 5
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Decide whether a failed request is worth retrying.
+
+    Args:
+        error: The exception raised by the request
+
+    Returns:
+        True for connection problems, timeouts and retryable HTTP statuses
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+
+def _with_retries(func):
+    """
+    Retry the wrapped coroutine on transient errors with exponential backoff
+    (1s, 2s, 4s, ...), re-raising the last error once all attempts are used.
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return await func(*args, **kwargs)
+            except httpx.HTTPError as error:
+                if attempt == RETRY_ATTEMPTS - 1 or not _is_retryable(error):
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    return wrapper
+
+
+def _auth_headers(token: str) -> dict:
+    """
+    Build the request headers for bearer token authentication.
+
+    Args:
+        token: The bearer token for authentication
+
+    Returns:
+        Dictionary of HTTP headers
+    """
+    return {"Authorization": f"Bearer {token}"}
+
+
+def new_client() -> httpx.AsyncClient:
+    """
+    Create an HTTP/2 client suitable for the helpers in this module.
+
+    Returns:
+        An httpx.AsyncClient; use it as an async context manager
+    """
+    return httpx.AsyncClient(http2=True, limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT)
+
+
+async def _read_file(source_file_path: str) -> AsyncIterator[bytes]:
+    """
+    Stream a local file in chunks without blocking the event loop.
+
+    Args:
+        source_file_path: Path to the local file
+
+    Yields:
+        Consecutive chunks of the file
+    """
+    with open(source_file_path, 'rb') as file:
+        while True:
+            chunk = await asyncio.to_thread(file.read, UPLOAD_READ_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+@_with_retries
+async def upload_file_async(client: httpx.AsyncClient, token: str, bucket_name: str,
+                            source_file_path: str,
+                            destination_blob_name: Optional[str] = None,
+                            cache_control: Optional[str] = DEFAULT_CACHE_CONTROL) -> str:
+    """
+    Upload a file to the bucket.
+
+    The content type is guessed from the file name and stored together with
+    cache_control on the object. The upload goes through the XML API, which
+    takes this metadata from the request headers of a single streamed PUT.
+
+    Args:
+        client: The httpx client to send the request with
+        token: The bearer token for authentication
+        bucket_name: Name of the bucket
+        source_file_path: Path to the local file to upload
+        destination_blob_name: Optional name for the file in the bucket
+                              (if not provided, uses the filename)
+        cache_control: Optional Cache-Control value to set on the object
+
+    Returns:
+        The name of the uploaded blob
+    """
+    if destination_blob_name is None:
+        destination_blob_name = os.path.basename(source_file_path)
+
+    url = f"{XML_API_URL}/{bucket_name}/{quote(destination_blob_name)}"
+
+    headers = _auth_headers(token)
+    headers["Content-Length"] = str(os.path.getsize(source_file_path))
+    headers["Content-Type"] = mimetypes.guess_type(source_file_path)[0] or DEFAULT_CONTENT_TYPE
+    if cache_control is not None:
+        headers["Cache-Control"] = cache_control
+
+    response = await client.put(url, headers=headers, content=_read_file(source_file_path))
+    response.raise_for_status()
+
+    return destination_blob_name
+
+
+async def delete_file_async(client: httpx.AsyncClient, token: str, bucket_name: str,
+                            blob_name: str) -> bool:
+    """
+    Delete a file from the bucket.
+
+    A 404 after a failed attempt counts as success, since that attempt may
+    have been applied on the server before its response was lost.
+
+    Args:
+        client: The httpx client to send the request with
+        token: The bearer token for authentication
+        bucket_name: Name of the bucket
+        blob_name: Name of the blob to delete
+
+    Returns:
+        True if successful
+    """
+    url = f"{API_URL}/b/{bucket_name}/o/{quote(blob_name, safe='')}"
+    failed = False
+
+    @_with_retries
+    async def delete():
+        nonlocal failed
+        try:
+            response = await client.delete(url, headers=_auth_headers(token))
+            if not (failed and response.status_code == 404):
+                response.raise_for_status()
+        except httpx.HTTPError:
+            failed = True
+            raise
+
+    await delete()
+
+    return True
+
+
+async def upload_directory_async(token: str, bucket_name: str, source_dir_path: str,
+                                 destination_prefix: str = '',
+                                 max_concurrency: int = 64) -> List[str]:
+    """
+    Upload an entire directory to the bucket.
+
+    Args:
+        token: The bearer token for authentication
+        bucket_name: Name of the bucket
+        source_dir_path: Path to the local directory to upload
+        destination_prefix: Optional prefix to add to the uploaded files in the bucket
+        max_concurrency: Maximum number of uploads in flight at once
+
+    Returns:
+        List of uploaded blob names
+    """
+    if not os.path.isdir(source_dir_path):
+        raise ValueError(f"Source directory does not exist: {source_dir_path}")
+
+    # Ensure destination prefix ends with a slash if it's not empty
+    if destination_prefix and not destination_prefix.endswith('/'):
+        destination_prefix += '/'
+
+    root = pathlib.Path(source_dir_path)
+    jobs = [
+        (str(path), destination_prefix + path.relative_to(root).as_posix())
+        for path in root.rglob('*')
+        if path.is_file()
+    ]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async with new_client() as client:
+        async def upload(local_path: str, dest_blob_name: str) -> str:
+            async with semaphore:
+                return await upload_file_async(client, token, bucket_name,
+                                               local_path, dest_blob_name)
+
+        return await asyncio.gather(*(upload(local_path, dest_blob_name)
+                                      for local_path, dest_blob_name in jobs))
+
+
+@_with_retries
+async def _list_page(client: httpx.AsyncClient, token: str, bucket_name: str,
+                     params: dict) -> dict:
+    """
+    Fetch a single page of an object listing.
+
+    Args:
+        client: The httpx client to send the request with
+        token: The bearer token for authentication
+        bucket_name: Name of the bucket
+        params: Query parameters for the listing request
+
+    Returns:
+        The decoded JSON response
+    """
+    response = await client.get(f"{API_URL}/b/{bucket_name}/o",
+                                headers=_auth_headers(token), params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+async def delete_folder_async(token: str, bucket_name: str, folder_path: str,
+                              max_concurrency: int = 64) -> List[str]:
+    """
+    Delete a folder and all its contents from the bucket.
+
+    Args:
+        token: The bearer token for authentication
+        bucket_name: Name of the bucket
+        folder_path: Path to the folder to delete
+        max_concurrency: Maximum number of deletes in flight at once
+
+    Returns:
+        List of deleted blob names
+    """
+    # Ensure folder path ends with a slash
+    if not folder_path.endswith('/'):
+        folder_path += '/'
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async with new_client() as client:
+        async def delete(blob_name: str) -> str:
+            async with semaphore:
+                await delete_file_async(client, token, bucket_name, blob_name)
+                return blob_name
+
+        params = {"prefix": folder_path, "fields": LIST_NAMES_FIELDS,
+                  "maxResults": LIST_PAGE_SIZE}
+        deleted_blobs = []
+
+        # Delete each page of the listing before asking for the next one
+        while True:
+            result = await _list_page(client, token, bucket_name, params)
+            names = [item["name"] for item in result.get("items", [])]
+            deleted_blobs.extend(await asyncio.gather(*(delete(name) for name in names)))
+
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                break
+            params["pageToken"] = page_token
+
+    return deleted_blobs
+
+
+# Example usage (commented out)
+"""
+import asyncio
+
+# Authentication token
+bearer_token = "your_bearer_token_here"
+
+# Bucket name
+bucket_name = "your-bucket-name"
+
+# Upload an entire directory
+uploaded_files = asyncio.run(
+    upload_directory_async(bearer_token, bucket_name, "local-directory", "remote-directory")
+)
+print(f"Uploaded directory files: {uploaded_files}")
+
+# Delete a folder
+deleted_items = asyncio.run(delete_folder_async(bearer_token, bucket_name, "folder-to-delete"))
+print(f"Deleted folder items: {deleted_items}")
+"""
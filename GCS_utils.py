@@ -3,28 +3,208 @@ Google Cloud Storage Utility Functions
 
 This module provides utility functions for common Google Cloud Storage operations
 using bearer token authentication.
+
+Wherever a token is accepted, a google.auth Credentials object can be passed
+instead. For a plain token string, setting GCS_REFRESH_TOKEN, GCS_CLIENT_ID
+and GCS_CLIENT_SECRET in the environment makes the credentials refreshable,
+so long-running uploads survive the token expiring.
 """
 
+from google.api_core import exceptions as api_exceptions
+from google.api_core import retry as api_retry
 from google.cloud import storage
-from google.auth.transport.requests import Request
+from google.cloud.storage import transfer_manager
+from google.cloud.storage.retry import DEFAULT_RETRY
+from google.auth.credentials import Credentials as AuthCredentials
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import AuthorizedSession, Request
 from google.oauth2.credentials import Credentials
 import os
-import glob
-from typing import List, Optional, Union
+import atexit
+import base64
+import gzip
+import json
+import mimetypes
+import queue
+import shutil
+import tempfile
+import threading
+import google_crc32c
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+# Populate the MIME type table once instead of on the first upload
+mimetypes.init()
+
+# Object metadata applied at upload time
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+COMPRESSIBLE_CONTENT_TYPES = {"application/json", "application/javascript"}
+
+# Integrity check computed while uploading; CRC32C uses the native
+# google-crc32c extension and is much cheaper than MD5
+UPLOAD_CHECKSUM = "crc32c"
+
+# OAuth endpoint and environment variables used to refresh expired tokens
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+REFRESH_TOKEN_ENV = "GCS_REFRESH_TOKEN"
+CLIENT_ID_ENV = "GCS_CLIENT_ID"
+CLIENT_SECRET_ENV = "GCS_CLIENT_SECRET"
+
+# Record of files already uploaded, used to skip unchanged files on re-runs
+MANIFEST_PATH = os.path.join(os.path.expanduser("~"), ".cache", "gcs-utils", "manifest.json")
+MANIFEST_SAVE_INTERVAL = 100
+
+# Files larger than this are uploaded as concurrent chunks instead of a
+# single sequential upload
+CHUNKED_UPLOAD_THRESHOLD = 64 * 1024 * 1024
+CHUNKED_UPLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_WORKERS = 8
 
+# Default number of concurrent upload threads
+DEFAULT_UPLOAD_WORKERS = 200
 
-def get_client_with_token(token: str) -> storage.Client:
+# Connection pool of each client's HTTP session; requests' default keeps only
+# 10 connections, so concurrent upload threads would reconnect on every call
+HTTP_POOL_CONNECTIONS = 32
+HTTP_POOL_MAXSIZE = DEFAULT_UPLOAD_WORKERS
+
+# Maximum number of files waiting to be uploaded while a directory is walked
+UPLOAD_QUEUE_SIZE = 1000
+
+# Maximum number of operations sent in a single batch request
+DELETE_BATCH_SIZE = 100
+
+# Partial response for listings that only need object names
+LIST_NAMES_FIELDS = "items(name),nextPageToken"
+LIST_PAGE_SIZE = 1000
+
+# The client library's retry for transient errors, with exponential backoff,
+# capped at RETRY_TIMEOUT seconds per operation
+RETRY_TIMEOUT = 60
+RETRY_POLICY = DEFAULT_RETRY.with_deadline(RETRY_TIMEOUT)
+
+
+@lru_cache(maxsize=8)
+def _get_credentials(token: Union[str, AuthCredentials]) -> AuthCredentials:
+    """
+    Return the credentials for a token, shared by every client built for it
+    so that a refresh is seen by all of them. Refreshing itself is done by
+    the clients' authorized sessions whenever a request gets a 401.
+    """
+    if isinstance(token, AuthCredentials):
+        return token
+    
+    refresh_token = os.environ.get(REFRESH_TOKEN_ENV)
+    client_id = os.environ.get(CLIENT_ID_ENV)
+    client_secret = os.environ.get(CLIENT_SECRET_ENV)
+    
+    if refresh_token and client_id and client_secret:
+        return Credentials(
+            token=token,
+            refresh_token=refresh_token,
+            token_uri=TOKEN_URI,
+            client_id=client_id,
+            client_secret=client_secret,
+        )
+    
+    return Credentials(token=token)
+
+
+def get_client_with_token(token: Union[str, AuthCredentials]) -> storage.Client:
     """
     Create a Google Cloud Storage client using bearer token authentication.
     
     Args:
-        token: The bearer token for authentication
+        token: The bearer token for authentication, or google.auth credentials
         
     Returns:
         A Google Cloud Storage client
     """
-    credentials = Credentials(token=token)
-    return storage.Client(credentials=credentials)
+    credentials = _get_credentials(token)
+    
+    # Size the connection pool for the worker threads sharing this client
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    
+    return storage.Client(credentials=credentials, _http=session)
+
+
+@lru_cache(maxsize=8)
+def _get_client(token: Union[str, AuthCredentials]) -> storage.Client:
+    """
+    Return a cached client for the given token so that repeated calls reuse
+    the same HTTP session and connection pool instead of rebuilding them.
+    """
+    return get_client_with_token(token)
+
+
+@lru_cache(maxsize=32)
+def _get_bucket(token: Union[str, AuthCredentials], bucket_name: str) -> storage.Bucket:
+    """
+    Return a cached bucket handle on the cached client for the given token.
+    """
+    return _get_client(token).bucket(bucket_name)
+
+
+@contextmanager
+def _explain_refresh_error(token: Union[str, AuthCredentials]) -> Iterator[None]:
+    """
+    Explain a failed token refresh when it is caused by missing refresh
+    credentials. Any other refresh failure, such as a revoked refresh token,
+    is re-raised unchanged.
+    """
+    try:
+        yield
+    except RefreshError as e:
+        credentials = _get_credentials(token)
+        if isinstance(credentials, Credentials) and not credentials.refresh_token:
+            raise RuntimeError(
+                f"Access token expired and no refresh credentials are configured; "
+                f"set {REFRESH_TOKEN_ENV}, {CLIENT_ID_ENV} and {CLIENT_SECRET_ENV} "
+                f"or pass refreshable credentials"
+            ) from e
+        raise
+
+
+def iter_bucket_contents(token: str, bucket_name: str, prefix: str = None) -> Iterator[str]:
+    """
+    Iterate over the object names in a bucket, optionally filtered by a prefix.
+    
+    Only the object names are requested from the API and pages are fetched
+    lazily, so large buckets are never held in memory at once. The next page
+    is requested in the background while the current one is being consumed.
+    
+    Args:
+        token: The bearer token for authentication
+        bucket_name: Name of the bucket
+        prefix: Optional prefix to filter objects (e.g., folder path)
+        
+    Yields:
+        Object names in the bucket
+    """
+    bucket = _get_bucket(token, bucket_name)
+    blobs = bucket.list_blobs(prefix=prefix, fields=LIST_NAMES_FIELDS,
+                              page_size=LIST_PAGE_SIZE, retry=RETRY_POLICY)
+    pages = blobs.pages
+    
+    with _explain_refresh_error(token), ThreadPoolExecutor(max_workers=1) as executor:
+        next_page = executor.submit(next, pages, None)
+        while True:
+            page = next_page.result()
+            if page is None:
+                break
+            
+            names = [blob.name for blob in page]
+            
+            # Prefetch the following page before handing these names out
+            next_page = executor.submit(next, pages, None)
+            yield from names
 
 
 def list_bucket_contents(token: str, bucket_name: str, prefix: str = None) -> List[str]:
@@ -39,11 +219,7 @@ def list_bucket_contents(token: str, bucket_name: str, prefix: str = None) -> Li
     Returns:
         List of object names in the bucket
     """
-    client = get_client_with_token(token)
-    bucket = client.bucket(bucket_name)
-    blobs = client.list_blobs(bucket, prefix=prefix)
-    
-    return [blob.name for blob in blobs]
+    return list(iter_bucket_contents(token, bucket_name, prefix))
 
 
 def list_folder_contents(token: str, bucket_name: str, folder_path: str) -> List[str]:
@@ -78,8 +254,7 @@ def create_folder(token: str, bucket_name: str, folder_path: str) -> bool:
     Returns:
         True if successful
     """
-    client = get_client_with_token(token)
-    bucket = client.bucket(bucket_name)
+    bucket = _get_bucket(token, bucket_name)
     
     # Ensure folder path ends with a slash
     if not folder_path.endswith('/'):
@@ -87,40 +262,467 @@ def create_folder(token: str, bucket_name: str, folder_path: str) -> bool:
     
     # Create an empty object with the folder path as its name
     blob = bucket.blob(folder_path)
-    blob.upload_from_string('')
+    with _explain_refresh_error(token):
+        blob.upload_from_string('', retry=RETRY_POLICY)
     
     return True
 
 
+def _guess_content_type(source_file_path: str) -> str:
+    """
+    Guess the MIME type of a local file from its name.
+    
+    Args:
+        source_file_path: Path to the local file
+        
+    Returns:
+        The MIME type, or DEFAULT_CONTENT_TYPE if it cannot be guessed
+    """
+    return mimetypes.guess_type(source_file_path)[0] or DEFAULT_CONTENT_TYPE
+
+
+def _is_compressible(content_type: str) -> bool:
+    """
+    Check whether a content type is text-like and worth gzip-compressing.
+    
+    Args:
+        content_type: The MIME type of the file
+        
+    Returns:
+        True if the content type compresses well
+    """
+    return content_type.startswith('text/') or content_type in COMPRESSIBLE_CONTENT_TYPES
+
+
+def _gzip_file(source_file_path: str, target) -> None:
+    """
+    Gzip a local file into a writable binary file object.
+    
+    The header carries no file name and a zero mtime, so the same input
+    always produces the same bytes.
+    
+    Args:
+        source_file_path: Path to the local file to compress
+        target: Binary file object to write the compressed stream to
+    """
+    with open(source_file_path, 'rb') as source, \
+            gzip.GzipFile(filename='', fileobj=target, mode='wb', mtime=0) as gzip_file:
+        shutil.copyfileobj(source, gzip_file)
+
+
+def _upload_to_blob(blob: storage.Blob, source_file_path: str,
+                    cache_control: Optional[str] = DEFAULT_CACHE_CONTROL,
+                    compress: bool = False,
+                    if_generation_match: Optional[int] = None) -> None:
+    """
+    Upload a local file into an existing blob handle.
+    
+    Args:
+        blob: The blob to upload to
+        source_file_path: Path to the local file to upload
+        cache_control: Optional Cache-Control value to set on the object
+        compress: Whether to gzip text-like files before uploading
+        if_generation_match: Optional generation precondition (0 means the
+                             object must not exist yet); not applied to
+                             chunked uploads
+    """
+    content_type = _guess_content_type(source_file_path)
+    
+    blob.content_type = content_type
+    blob.cache_control = cache_control
+    
+    if compress and _is_compressible(content_type):
+        blob.content_encoding = 'gzip'
+        
+        # Compress into a temporary file so memory use stays bounded
+        with tempfile.TemporaryFile() as compressed:
+            _gzip_file(source_file_path, compressed)
+            
+            # A known size lets small files go up in a single request
+            # instead of opening a resumable session first
+            size = compressed.tell()
+            compressed.seek(0)
+            blob.upload_from_file(compressed, size=size, content_type=content_type,
+                                  checksum=UPLOAD_CHECKSUM, retry=RETRY_POLICY,
+                                  if_generation_match=if_generation_match)
+    elif os.path.getsize(source_file_path) > CHUNKED_UPLOAD_THRESHOLD:
+        transfer_manager.upload_chunks_concurrently(
+            source_file_path,
+            blob,
+            content_type=content_type,
+            chunk_size=CHUNKED_UPLOAD_CHUNK_SIZE,
+            max_workers=CHUNKED_UPLOAD_MAX_WORKERS,
+            worker_type=transfer_manager.THREAD,
+            retry=RETRY_POLICY,
+        )
+    else:
+        blob.upload_from_filename(source_file_path, content_type=content_type,
+                                  checksum=UPLOAD_CHECKSUM, retry=RETRY_POLICY,
+                                  if_generation_match=if_generation_match)
+
+
+_manifest = None
+_manifest_unsaved = 0
+_manifest_lock = threading.Lock()
+
+
+def _load_manifest() -> dict:
+    """
+    Return the upload manifest, reading it from MANIFEST_PATH on first use.
+    """
+    global _manifest
+    
+    with _manifest_lock:
+        if _manifest is None:
+            try:
+                with open(MANIFEST_PATH) as f:
+                    _manifest = json.load(f)
+            except (OSError, ValueError):
+                _manifest = {}
+        
+        return _manifest
+
+
+def _save_manifest(force: bool = True) -> None:
+    """
+    Write the upload manifest back to MANIFEST_PATH.
+    
+    Args:
+        force: Write any unsaved entries; otherwise only write once at least
+               MANIFEST_SAVE_INTERVAL entries are pending
+    """
+    global _manifest_unsaved
+    
+    with _manifest_lock:
+        if _manifest is None or _manifest_unsaved == 0:
+            return
+        if not force and _manifest_unsaved < MANIFEST_SAVE_INTERVAL:
+            return
+        
+        os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+        
+        # Write to a temporary file first so a crash never leaves a partial manifest
+        temp_path = MANIFEST_PATH + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(_manifest, f)
+        os.replace(temp_path, MANIFEST_PATH)
+        _manifest_unsaved = 0
+
+
+# Entries still pending from single-file uploads are written on exit
+atexit.register(_save_manifest)
+
+
+def _crc32c(file) -> str:
+    """
+    Compute the CRC32C of a binary file object in the base64 form GCS reports.
+    
+    Args:
+        file: Binary file object, read from its current position to the end
+        
+    Returns:
+        The base64-encoded CRC32C checksum
+    """
+    checksum = google_crc32c.Checksum()
+    
+    for chunk in iter(lambda: file.read(CHUNKED_UPLOAD_CHUNK_SIZE), b''):
+        checksum.update(chunk)
+    
+    return base64.b64encode(checksum.digest()).decode('utf-8')
+
+
+def _local_crc32c(source_file_path: str, compressed: bool) -> str:
+    """
+    Compute the CRC32C of the bytes an upload of a local file would store.
+    
+    Args:
+        source_file_path: Path to the local file
+        compressed: Whether the file is stored gzip-compressed
+        
+    Returns:
+        The base64-encoded CRC32C checksum
+    """
+    if not compressed:
+        with open(source_file_path, 'rb') as f:
+            return _crc32c(f)
+    
+    # The gzip stream is reproducible, so it matches what was uploaded
+    with tempfile.TemporaryFile() as gzipped:
+        _gzip_file(source_file_path, gzipped)
+        gzipped.seek(0)
+        return _crc32c(gzipped)
+
+
+def _remote_matches(blob: storage.Blob, source_file_path: str, compressed: bool,
+                    cache_control: Optional[str]) -> bool:
+    """
+    Check whether a blob exists with the same content as an upload of a local file.
+    
+    Args:
+        blob: The blob to check; its properties are reloaded from the server
+        source_file_path: Path to the local file
+        compressed: Whether the file is stored gzip-compressed
+        cache_control: The Cache-Control value the upload would set
+        
+    Returns:
+        True if the object exists and its Cache-Control and CRC32C match
+    """
+    try:
+        blob.reload()
+    except api_exceptions.NotFound:
+        return False
+    
+    return (blob.cache_control == cache_control
+            and blob.crc32c == _local_crc32c(source_file_path, compressed))
+
+
+def _upload_unless_unchanged(blob: storage.Blob, source_file_path: str,
+                             cache_control: Optional[str] = DEFAULT_CACHE_CONTROL,
+                             compress: bool = False) -> None:
+    """
+    Upload a local file into a blob unless it is known to be there already.
+    
+    Files whose path, size, mtime and upload options match the manifest entry
+    for the blob are skipped without any request. Otherwise the upload only
+    creates the object if it does not exist; if it does, it is overwritten
+    only when its CRC32C or Cache-Control differs from what the upload would
+    store. Chunked uploads cannot take that precondition, so for them the
+    object is checked first. The manifest is updated in memory.
+    
+    Args:
+        blob: The blob to upload to
+        source_file_path: Path to the local file to upload
+        cache_control: Optional Cache-Control value to set on the object
+        compress: Whether to gzip text-like files before uploading
+    """
+    stat = os.stat(source_file_path)
+    compressed = compress and _is_compressible(_guess_content_type(source_file_path))
+    key = f"{blob.bucket.name}/{blob.name}"
+    local_state = {
+        "path": os.path.abspath(source_file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "compressed": compressed,
+        "cache_control": cache_control,
+    }
+    
+    manifest = _load_manifest()
+    with _manifest_lock:
+        entry = manifest.get(key)
+    
+    if entry is not None and all(entry.get(k) == v for k, v in local_state.items()):
+        return
+    
+    if not compressed and stat.st_size > CHUNKED_UPLOAD_THRESHOLD:
+        if not _remote_matches(blob, source_file_path, compressed, cache_control):
+            _upload_to_blob(blob, source_file_path, cache_control, compress)
+    else:
+        try:
+            _upload_to_blob(blob, source_file_path, cache_control, compress,
+                            if_generation_match=0)
+        except api_exceptions.PreconditionFailed:
+            # The object already exists; only replace it if the content differs
+            if not _remote_matches(blob, source_file_path, compressed, cache_control):
+                _upload_to_blob(blob, source_file_path, cache_control, compress,
+                                if_generation_match=blob.generation)
+    
+    global _manifest_unsaved
+    with _manifest_lock:
+        manifest[key] = local_state
+        _manifest_unsaved += 1
+
+
 def upload_file(token: str, bucket_name: str, source_file_path: str, 
-                destination_blob_name: Optional[str] = None) -> str:
+                destination_blob_name: Optional[str] = None,
+                cache_control: Optional[str] = DEFAULT_CACHE_CONTROL,
+                compress: bool = False, skip_unchanged: bool = False) -> str:
     """
     Upload a file to the bucket.
     
+    The content type is guessed from the file name and stored together with
+    cache_control on the object. With compress=True, text-like files are
+    gzip-compressed before upload and stored with Content-Encoding: gzip.
+    
+    Files larger than CHUNKED_UPLOAD_THRESHOLD are split into chunks that are
+    uploaded concurrently and assembled server-side. Objects created this way
+    have no MD5 hash, so use the CRC32C checksum and etag to verify them.
+    
     Args:
         token: The bearer token for authentication
         bucket_name: Name of the bucket
         source_file_path: Path to the local file to upload
         destination_blob_name: Optional name for the file in the bucket
                               (if not provided, uses the filename)
+        cache_control: Optional Cache-Control value to set on the object
+        compress: Whether to gzip text-like files before uploading
+        skip_unchanged: Whether to skip files already uploaded unchanged,
+                        tracked in the manifest at MANIFEST_PATH (written
+                        every MANIFEST_SAVE_INTERVAL uploads and on exit)
         
     Returns:
         The name of the uploaded blob
     """
-    client = get_client_with_token(token)
-    bucket = client.bucket(bucket_name)
-    
     if destination_blob_name is None:
         destination_blob_name = os.path.basename(source_file_path)
     
-    blob = bucket.blob(destination_blob_name)
-    blob.upload_from_filename(source_file_path)
+    blob = _get_bucket(token, bucket_name).blob(destination_blob_name)
+    
+    with _explain_refresh_error(token):
+        if skip_unchanged:
+            try:
+                _upload_unless_unchanged(blob, source_file_path, cache_control, compress)
+            finally:
+                # Write the manifest in batches so looping over files stays cheap
+                _save_manifest(force=False)
+        else:
+            _upload_to_blob(blob, source_file_path, cache_control, compress)
     
     return destination_blob_name
 
 
+def _iter_files(source_dir_path: str) -> Iterator[str]:
+    """
+    Recursively yield the paths of all files under a directory.
+    
+    Uses os.scandir so file/directory checks come from the cached directory
+    entry instead of an extra stat per file. Like os.walk, symlinked
+    directories are not descended into.
+    
+    Args:
+        source_dir_path: Path to the local directory
+        
+    Yields:
+        Paths of the files, each starting with source_dir_path
+    """
+    stack = [source_dir_path]
+    
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+
+
+def _directory_upload_jobs(source_dir_path: str, destination_prefix: str = '') -> Iterator[Tuple[str, str]]:
+    """
+    Generate the (local path, destination blob name) pairs for every file in a directory.
+    
+    Args:
+        source_dir_path: Path to the local directory
+        destination_prefix: Prefix (ending with '/' or empty) for the blob names
+        
+    Yields:
+        (local_path, dest_blob_name) tuples
+    """
+    # Normalize first so every yielded path starts with exactly this prefix
+    # and the relative path is just a slice instead of an os.path.relpath call
+    source_dir_path = os.path.normpath(source_dir_path)
+    prefix_len = len(source_dir_path.rstrip(os.sep)) + 1
+    
+    for local_path in _iter_files(source_dir_path):
+        rel_path = local_path[prefix_len:]
+        if os.sep != '/':
+            rel_path = rel_path.replace(os.sep, '/')
+        
+        yield local_path, destination_prefix + rel_path
+
+
+def _upload_many(token: str, bucket_name: str, jobs: Iterable[Tuple[str, str]],
+                 max_workers: int = DEFAULT_UPLOAD_WORKERS, skip_unchanged: bool = False) -> List[str]:
+    """
+    Upload (local path, destination blob name) pairs concurrently.
+    
+    A producer thread consumes jobs (typically a lazy directory walk) into a
+    bounded queue while worker threads upload from it, so uploads start as
+    soon as the first file is found instead of after the whole walk. Worker
+    threads are started as jobs arrive, up to max_workers.
+    
+    Args:
+        token: The bearer token for authentication
+        bucket_name: Name of the bucket
+        jobs: Iterable of (local_path, dest_blob_name) tuples
+        max_workers: Maximum number of concurrent uploads
+        skip_unchanged: Whether to skip files already uploaded unchanged
+        
+    Returns:
+        List of uploaded blob names, in the same order as jobs
+    """
+    if max_workers <= 0:
+        raise ValueError("max_workers must be greater than 0")
+    
+    bucket = _get_bucket(token, bucket_name)
+    job_queue = queue.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+    uploaded = {}
+    errors = []
+    failed = threading.Event()
+    consumers = []
+    
+    def produce():
+        try:
+            for index, job in enumerate(jobs):
+                if failed.is_set():
+                    break
+                
+                # Only start as many workers as there are jobs to run
+                if len(consumers) < max_workers:
+                    consumer = threading.Thread(target=consume)
+                    consumer.start()
+                    consumers.append(consumer)
+                
+                job_queue.put((index, job))
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+        finally:
+            # One sentinel per worker so every consumer shuts down
+            for _ in consumers:
+                job_queue.put(None)
+    
+    def consume():
+        while True:
+            item = job_queue.get()
+            if item is None:
+                break
+            
+            # Keep draining after a failure so the producer never blocks
+            if failed.is_set():
+                continue
+            
+            index, (local_path, dest_blob_name) = item
+            upload = _upload_unless_unchanged if skip_unchanged else _upload_to_blob
+            try:
+                # The client's authorized session refreshes an expired token
+                # and retries the request by itself
+                with _explain_refresh_error(token):
+                    upload(bucket.blob(dest_blob_name), local_path)
+                uploaded[index] = dest_blob_name
+            except Exception as e:
+                errors.append(e)
+                failed.set()
+    
+    producer = threading.Thread(target=produce)
+    producer.start()
+    producer.join()
+    
+    # The producer has started every consumer by the time it finishes
+    for consumer in consumers:
+        consumer.join()
+    
+    # Persist progress even when the batch failed part-way
+    if skip_unchanged:
+        _save_manifest()
+    
+    if errors:
+        raise errors[0]
+    
+    return [uploaded[index] for index in sorted(uploaded)]
+
+
 def upload_directory(token: str, bucket_name: str, source_dir_path: str, 
-                    destination_prefix: str = '') -> List[str]:
+                    destination_prefix: str = '', max_workers: int = DEFAULT_UPLOAD_WORKERS,
+                    skip_unchanged: bool = False) -> List[str]:
     """
     Upload an entire directory to the bucket.
     
@@ -129,6 +731,9 @@ def upload_directory(token: str, bucket_name: str, source_dir_path: str,
         bucket_name: Name of the bucket
         source_dir_path: Path to the local directory to upload
         destination_prefix: Optional prefix to add to the uploaded files in the bucket
+        max_workers: Maximum number of concurrent uploads
+        skip_unchanged: Whether to skip files already uploaded unchanged,
+                        tracked in the manifest at MANIFEST_PATH
         
     Returns:
         List of uploaded blob names
@@ -140,28 +745,16 @@ def upload_directory(token: str, bucket_name: str, source_dir_path: str,
     if destination_prefix and not destination_prefix.endswith('/'):
         destination_prefix += '/'
     
-    uploaded_files = []
+    # Walk the directory while its files are being uploaded
+    jobs = _directory_upload_jobs(source_dir_path, destination_prefix)
     
-    # First, find all files in the directory and its subdirectories
-    for root, _, files in os.walk(source_dir_path):
-        for filename in files:
-            local_path = os.path.join(root, filename)
-            
-            # Determine the relative path from the source directory
-            rel_path = os.path.relpath(local_path, source_dir_path)
-            
-            # Compute the destination blob name
-            dest_blob_name = os.path.join(destination_prefix, rel_path).replace('\\', '/')
-            
-            # Upload the file
-            uploaded_file = upload_file(token, bucket_name, local_path, dest_blob_name)
-            uploaded_files.append(uploaded_file)
-    
-    return uploaded_files
+    return _upload_many(token, bucket_name, jobs, max_workers, skip_unchanged)
 
 
 def upload_files_and_directories(token: str, bucket_name: str, 
-                                paths: List[str], destination_prefix: str = '') -> List[str]:
+                                paths: List[str], destination_prefix: str = '',
+                                max_workers: int = DEFAULT_UPLOAD_WORKERS,
+                                skip_unchanged: bool = False) -> List[str]:
     """
     Upload multiple files or directories to the bucket.
     
@@ -170,6 +763,9 @@ def upload_files_and_directories(token: str, bucket_name: str,
         bucket_name: Name of the bucket
         paths: List of local file or directory paths to upload
         destination_prefix: Optional prefix to add to the uploaded files in the bucket
+        max_workers: Maximum number of concurrent uploads
+        skip_unchanged: Whether to skip files already uploaded unchanged,
+                        tracked in the manifest at MANIFEST_PATH
         
     Returns:
         List of uploaded blob names
@@ -177,24 +773,25 @@ def upload_files_and_directories(token: str, bucket_name: str,
     if destination_prefix and not destination_prefix.endswith('/'):
         destination_prefix += '/'
     
-    uploaded_files = []
+    job_groups = []
     
     for path in paths:
         if os.path.isfile(path):
             # It's a file, upload it directly
-            dest_blob_name = os.path.join(destination_prefix, os.path.basename(path)).replace('\\', '/')
-            uploaded_file = upload_file(token, bucket_name, path, dest_blob_name)
-            uploaded_files.append(uploaded_file)
+            dest_blob_name = destination_prefix + os.path.basename(path)
+            job_groups.append([(path, dest_blob_name)])
         elif os.path.isdir(path):
             # It's a directory, upload its contents
-            dir_name = os.path.basename(path)
-            dir_dest_prefix = os.path.join(destination_prefix, dir_name).replace('\\', '/')
-            uploaded_dir_files = upload_directory(token, bucket_name, path, dir_dest_prefix)
-            uploaded_files.extend(uploaded_dir_files)
+            dir_name = os.path.basename(os.path.normpath(path))
+            dir_dest_prefix = destination_prefix
+            if dir_name:
+                dir_dest_prefix += dir_name + '/'
+            job_groups.append(_directory_upload_jobs(path, dir_dest_prefix))
         else:
             raise ValueError(f"Path does not exist: {path}")
     
-    return uploaded_files
+    return _upload_many(token, bucket_name, chain.from_iterable(job_groups),
+                        max_workers, skip_unchanged)
 
 
 def delete_file(token: str, bucket_name: str, blob_name: str) -> bool:
@@ -209,15 +806,51 @@ def delete_file(token: str, bucket_name: str, blob_name: str) -> bool:
     Returns:
         True if successful
     """
-    client = get_client_with_token(token)
-    bucket = client.bucket(bucket_name)
+    bucket = _get_bucket(token, bucket_name)
     blob = bucket.blob(blob_name)
     
-    blob.delete()
+    # Record retried errors, since a retry may follow a delete that was
+    # applied on the server before its response was lost
+    retried_errors = []
+    retry = api_retry.Retry(
+        predicate=RETRY_POLICY._predicate,
+        deadline=RETRY_TIMEOUT,
+        on_error=retried_errors.append,
+    )
+    
+    try:
+        with _explain_refresh_error(token):
+            blob.delete(retry=retry)
+    except api_exceptions.NotFound:
+        if not retried_errors:
+            raise
+    
     return True
 
 
-def delete_folder(token: str, bucket_name: str, folder_path: str) -> List[str]:
+def _delete_batch(token: str, bucket_name: str, blob_names: List[str]) -> List[str]:
+    """
+    Delete a group of blobs with a single batch request.
+    
+    Args:
+        token: The bearer token for authentication
+        bucket_name: Name of the bucket
+        blob_names: Names of the blobs to delete
+        
+    Returns:
+        List of deleted blob names
+    """
+    bucket = _get_bucket(token, bucket_name)
+    
+    with bucket.client.batch():
+        for blob_name in blob_names:
+            bucket.blob(blob_name).delete()
+    
+    return blob_names
+
+
+def delete_folder(token: str, bucket_name: str, folder_path: str,
+                  max_workers: int = 16) -> List[str]:
     """
     Delete a folder and all its contents from the bucket.
     
@@ -225,25 +858,33 @@ def delete_folder(token: str, bucket_name: str, folder_path: str) -> List[str]:
         token: The bearer token for authentication
         bucket_name: Name of the bucket
         folder_path: Path to the folder to delete
+        max_workers: Maximum number of batch requests in flight at once
         
     Returns:
         List of deleted blob names
     """
-    client = get_client_with_token(token)
-    bucket = client.bucket(bucket_name)
+    bucket = _get_bucket(token, bucket_name)
     
     # Ensure folder path ends with a slash
     if not folder_path.endswith('/'):
         folder_path += '/'
     
     # List all blobs in the folder
-    blobs = client.list_blobs(bucket, prefix=folder_path)
+    blobs = iter(bucket.list_blobs(prefix=folder_path, fields=LIST_NAMES_FIELDS,
+                                   retry=RETRY_POLICY))
     deleted_blobs = []
     
-    # Delete each blob
-    for blob in blobs:
-        blob.delete()
-        deleted_blobs.append(blob.name)
+    # Delete the blobs in batches, sending several batches concurrently
+    with _explain_refresh_error(token), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        while True:
+            chunk = [blob.name for blob in islice(blobs, DELETE_BATCH_SIZE)]
+            if not chunk:
+                break
+            futures.append(executor.submit(_delete_batch, token, bucket_name, chunk))
+        
+        for future in futures:
+            deleted_blobs.extend(future.result())
     
     return deleted_blobs
 
@@ -260,6 +901,10 @@ bucket_name = "your-bucket-name"
 all_items = list_bucket_contents(bearer_token, bucket_name)
 print(f"All items in bucket: {all_items}")
 
+# Stream the contents of a large bucket without loading it all at once
+for item in iter_bucket_contents(bearer_token, bucket_name, "my-folder/"):
+    print(item)
+
 # List contents of a specific folder
 folder_items = list_folder_contents(bearer_token, bucket_name, "my-folder")
 print(f"Items in my-folder: {folder_items}")
@@ -281,6 +926,10 @@ paths_to_upload = ["file1.txt", "file2.jpg", "directory1", "directory2"]
 uploaded_items = upload_files_and_directories(bearer_token, bucket_name, paths_to_upload, "uploads")
 print(f"Uploaded items: {uploaded_items}")
 
+# Re-run the upload, skipping files that have not changed since the last run
+uploaded_items = upload_files_and_directories(bearer_token, bucket_name, paths_to_upload, "uploads",
+                                              skip_unchanged=True)
+
 # Delete a file
 delete_file(bearer_token, bucket_name, "remote-file.txt")
 print("Deleted file: remote-file.txt")